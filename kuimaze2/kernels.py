@@ -0,0 +1,81 @@
+"""
+Extension module with array kernels for tabular MDP solvers.
+
+The kernels work on the transition arrays precomputed by `kuimaze2.mdp.MDP`
+(`_next_states`, `_probs`, `_state_rewards`). If Numba is installed, they are JIT-compiled;
+otherwise, equivalent NumPy implementations are used.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+
+def _bellman_max_numpy(
+    values: np.ndarray,
+    rewards: np.ndarray,
+    next_states: np.ndarray,
+    probs: np.ndarray,
+    gamma: float,
+) -> np.ndarray:
+    next_values = np.where(next_states >= 0, values[next_states], 0.0)
+    q_values = rewards[:, np.newaxis] + gamma * np.einsum(
+        "sak,sak->sa", probs, next_values
+    )
+    return q_values.max(axis=1)
+
+
+if njit is not None:
+
+    # No "ninf" in fastmath flags: the maximum search starts from -inf
+    @njit(
+        parallel=True, fastmath={"contract", "reassoc", "nsz", "arcp"}, cache=True
+    )
+    def _bellman_max_numba(values, rewards, next_states, probs, gamma):
+        n_states, n_actions, n_outcomes = next_states.shape
+        new_values = np.empty(n_states)
+        for s in prange(n_states):
+            best = -np.inf
+            for a in range(n_actions):
+                expected = 0.0
+                for k in range(n_outcomes):
+                    idx = next_states[s, a, k]
+                    if idx >= 0:
+                        expected += probs[s, a, k] * values[idx]
+                q_value = rewards[s] + gamma * expected
+                if q_value > best:
+                    best = q_value
+            new_values[s] = best
+        return new_values
+
+
+def bellman_max(
+    values: np.ndarray,
+    rewards: np.ndarray,
+    next_states: np.ndarray,
+    probs: np.ndarray,
+    gamma: float,
+) -> np.ndarray:
+    """Perform one Bellman optimality backup for all states at once.
+
+    Arguments:
+
+        values: array of shape (S,) with the current state values.
+
+        rewards: array of shape (S,) with the rewards for leaving the states.
+
+        next_states: array of shape (S, A, K) with the indices of possible next states;
+            -1 marks leaving a terminal state (contributes no future value).
+
+        probs: array of shape (S, A, K) with the probabilities of the next states.
+
+        gamma: the discount factor.
+
+    Return the array of shape (S,) with the new state values.
+    """
+    if njit is not None:
+        return _bellman_max_numba(values, rewards, next_states, probs, gamma)
+    return _bellman_max_numpy(values, rewards, next_states, probs, gamma)
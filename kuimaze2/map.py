@@ -1,42 +1,49 @@
 import os
 from dataclasses import dataclass, field
 from enum import Enum, IntEnum, IntFlag
-from functools import cached_property
+from operator import itemgetter
 from pathlib import Path
 from typing import Self, Sequence
 
+import numpy as np
 
-@dataclass(frozen=True)
-class MazeVec:
-    """A 2D vector-like class used to represent maze coordinates (r,c)."""
 
-    r: int = 0
-    c: int = 0
+class MazeVec(tuple):
+    """A 2D vector-like class used to represent maze coordinates (r,c).
 
-    def __len__(self):
-        return 2
+    It is a tuple (r, c), so hashing and comparison are as cheap as for plain tuples.
+    """
 
-    def __getitem__(self, key):
-        if key == 0:
-            return self.r
-        if key == 1:
-            return self.c
-        raise IndexError(f"MazeVec index out of range: {key}")
+    __slots__ = ()
+
+    def __new__(cls, r: int = 0, c: int = 0) -> Self:
+        return tuple.__new__(cls, (r, c))
+
+    def __getnewargs__(self):
+        return tuple(self)
+
+    r = property(itemgetter(0))
+    c = property(itemgetter(1))
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(r={self[0]}, c={self[1]})"
 
     def __add__(self, other: Self) -> Self:
-        return self.__class__(self.r + other.r, self.c + other.c)
+        return self.__class__(self[0] + other[0], self[1] + other[1])
 
     def __sub__(self, other: Self) -> Self:
-        return self.__class__(self.r - other.r, self.c - other.c)
+        return self.__class__(self[0] - other[0], self[1] - other[1])
 
-    @cached_property
+    @property
     def norm(self):
-        return (self.r**2 + self.c**2) ** 0.5
+        return (self[0] ** 2 + self[1] ** 2) ** 0.5
 
 
 class State(MazeVec):
     """Representation of State in all maze-related environments."""
 
+    __slots__ = ()
+
     def __str__(self):
         return f"S({self.r},{self.c})"
 
@@ -54,27 +61,31 @@ class Action(IntEnum):
 
         Can be added to/subtracted from a State to get a new State.
         """
-        if self == Action.UP:
-            return MazeVec(r=-1, c=0)
-        elif self == Action.RIGHT:
-            return MazeVec(r=0, c=1)
-        elif self == Action.DOWN:
-            return MazeVec(r=1, c=0)
-        elif self == Action.LEFT:
-            return MazeVec(r=0, c=-1)
-        assert False, "Unreachable"
+        return _ACTION_DELTAS[self.value]
 
     def __str__(self):
         """Return a character represeting the action."""
-        if self == Action.UP:
-            return "⮝"  # "⮉"  # "↑" # "🠝" #
-        elif self == Action.RIGHT:
-            return "⮞"  # "⮊"  # "→" # "🠞" #
-        elif self == Action.DOWN:
-            return "⮟"  # "⮋"  # "↓" # "🠟" #
-        elif self == Action.LEFT:
-            return "⮜"  # "⮈"  # "←" # "🠜" #
-        assert False, "Unreachable"
+        return _ACTION_STR[self.value]
+
+
+ALL_ACTIONS: tuple[Action, ...] = tuple(Action)
+"""All actions ordered by their values. Faster to iterate than the Action enum itself."""
+
+# Indexed by Action value
+_ACTION_STR = (
+    "⮝",  # "⮉"  # "↑" # "🠝" #
+    "⮞",  # "⮊"  # "→" # "🠞" #
+    "⮟",  # "⮋"  # "↓" # "🠟" #
+    "⮜",  # "⮈"  # "←" # "🠜" #
+)
+
+# Indexed by Action value
+_ACTION_DELTAS = (
+    MazeVec(r=-1, c=0),
+    MazeVec(r=0, c=1),
+    MazeVec(r=1, c=0),
+    MazeVec(r=0, c=-1),
+)
 
 
 class Role(Enum):
@@ -99,14 +110,18 @@ class Border(IntFlag):
     @classmethod
     def corresponding_to(cls, action: Action) -> Self:
         """Return the border corresponding to action."""
-        return cls(2**action.value)
+        return _BORDER_FOR_ACTION[action.value]
 
     def prevents_action(self, action: Action) -> bool:
         """Return True if the border setting prevents a specific action."""
-        return Border.corresponding_to(action) in self
+        return bool(self & _BORDER_FOR_ACTION[action])
+
 
+# Indexed by Action value
+_BORDER_FOR_ACTION = (Border.TOP, Border.RIGHT, Border.BOTTOM, Border.LEFT)
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True, eq=False)
 class Cell:
     position: State = field(default_factory=State)
     role: Role = Role.EMPTY
@@ -125,34 +140,54 @@ class Cell:
     #     return self.border.bit_count() < 2
 
 
+# Roles are stored in the map as ASCII codes of their characters
+ROLE_FROM_CODE: dict[int, Role] = {ord(role.value): role for role in Role}
+WALL_CODE = ord(Role.WALL.value)
+# All combinations of borders, indexed by their integer value
+BORDER_FROM_CODE: tuple[Border, ...] = tuple(Border(code) for code in range(16))
+
+
 class Map:
     """Map of a maze represented as a collection of cells.
 
     Map contains the constant part of a maze (the obstacles, walls, and free/empty cells),
     and also the default start and goal states if specified.
+
+    The map is stored as two 2D arrays: `roles` holds the ASCII codes of the cell roles,
+    `borders` holds the `Border` flags of the cells. `Cell` instances are created on demand.
     """
 
     def __init__(self, cells: Sequence[Cell] | None = None):
         cells = cells or [Cell()]
-        self.cell_at: dict[State, Cell] = {}
+        height = max(cell.position.r for cell in cells) + 1
+        width = max(cell.position.c for cell in cells) + 1
+        # Cells not defined in the input are walls
+        roles = np.full((height, width), WALL_CODE, dtype=np.uint8)
+        borders = np.zeros((height, width), dtype=np.uint8)
         for cell in cells:
-            self.cell_at[cell.position] = cell
+            roles[cell.position.r, cell.position.c] = ord(cell.role.value)
+            borders[cell.position.r, cell.position.c] = cell.border
+        self._init_grids(roles, borders)
+
+    def _init_grids(self, roles: np.ndarray, borders: np.ndarray) -> None:
+        """Set up the map from the roles and (initial) borders arrays."""
+        self.roles = roles
+        self.borders = borders
+        self.height, self.width = roles.shape
+        self.number_of_accessible_states = int(np.count_nonzero(roles != WALL_CODE))
+        self._starts = self._states_with_role(Role.START)
+        # The goal and danger states as specified in the map
+        self.goals: set[State] = set(self._states_with_role(Role.GOAL))
+        self.dangers: set[State] = set(self._states_with_role(Role.DANGER))
         self._complete()
 
+    def _states_with_role(self, role: Role) -> list[State]:
+        positions = np.argwhere(self.roles == ord(role.value)).tolist()
+        return [State(r, c) for r, c in positions]
+
     def __str__(self) -> str:
         """Return a string representation of the map."""
-        rows = []
-        for r in range(self.height):
-            row = []
-            for c in range(self.width):
-                cell = self[State(r, c)]
-                row.append(cell.role.value)
-            rows.append("".join(row))
-        return "\n".join(rows)
-
-    @cached_property
-    def number_of_accessible_states(self):
-        return len([state for state, cell in self.cell_at.items() if cell.is_free()])
+        return b"\n".join(row.tobytes() for row in self.roles).decode("ascii")
 
     @classmethod
     def from_string(cls, input: str) -> Self:
@@ -166,15 +201,30 @@ class Map:
         '''
         >>> map = Map.from_string(map_string)
         """
-        cells = []
         # Remove empty rows and white space at the beginning and end of each row
         rows = [r.strip() for r in input.splitlines() if r.strip()]
-        for r, row in enumerate(rows):
-            if not row.strip():
-                continue
-            for c, char in enumerate(row):
-                cells.append(Cell(position=State(r, c), role=Role(char)))
-        return cls(cells=cells)
+        if not rows:
+            return cls()
+        # Cells missing at the end of shorter rows are walls
+        width = max(len(row) for row in rows)
+        data = "".join(row.ljust(width, Role.WALL.value) for row in rows)
+        roles = np.frombuffer(data.encode("ascii"), dtype=np.uint8)
+        return cls.from_roles(roles.reshape(len(rows), width))
+
+    @classmethod
+    def from_roles(cls, roles: np.ndarray) -> Self:
+        """Create a map from a 2D array of ASCII codes of role characters.
+
+        Example:
+        >>> map = Map.from_roles(np.array([[ord("S"), ord("G")]]))
+        """
+        roles = np.array(roles, dtype=np.uint8, ndmin=2)
+        unknown = np.setdiff1d(roles, list(ROLE_FROM_CODE))
+        if unknown.size:
+            raise ValueError(f"Map: Unknown roles: {[chr(code) for code in unknown]}")
+        map = cls.__new__(cls)
+        map._init_grids(roles, np.zeros_like(roles))
+        return map
 
     @classmethod
     def from_file(cls, fpath: os.PathLike) -> Self:
@@ -186,41 +236,28 @@ class Map:
             content = f.read()
         return cls.from_string(content)
 
-    @cached_property
-    def width(self) -> int:
-        return max(cell.position.c for cell in self.cell_at.values()) + 1
-
-    @cached_property
-    def height(self) -> int:
-        return max(cell.position.r for cell in self.cell_at.values()) + 1
-
-    @cached_property
+    @property
     def start(self) -> State | None:
         """Return the start state as specified in the map, or None."""
-        starts = [cell.position for cell in self if cell.role == Role.START]
-        if len(starts) > 1:
-            raise ValueError(f"Map: Multiple start squares are prohibited: {starts}")
-        return starts[0] if starts else None
-
-    @cached_property
-    def goals(self) -> set[State]:
-        """Return the set goal states as specified in the map."""
-        return {cell.position for cell in self if cell.role == Role.GOAL}
-
-    @cached_property
-    def dangers(self) -> set[State]:
-        """Return the set danger states as specified in the map."""
-        return {cell.position for cell in self if cell.role == Role.DANGER}
+        if len(self._starts) > 1:
+            raise ValueError(
+                f"Map: Multiple start squares are prohibited: {self._starts}"
+            )
+        return self._starts[0] if self._starts else None
 
     def accessible_neighbor_states(self, state: State) -> list[State]:
         return [
             self.get_transition_result(state, action)
-            for action in Action
+            for action in ALL_ACTIONS
             if self.transition_possible(state, action)
         ]
 
     def transition_possible(self, state: State, action: Action) -> bool:
-        return not self[state].border.prevents_action(action)
+        r, c = state
+        if not (0 <= r < self.height and 0 <= c < self.width):
+            # Cells outside the map have no borders
+            return True
+        return not (self.borders.item(r, c) & _BORDER_FOR_ACTION[action])
 
     def get_transition_result(self, state: State, action: Action) -> State:
         """Return the result of applying action to state.
@@ -232,19 +269,24 @@ class Map:
         return state + action.to_vec()
 
     def __len__(self):
-        return len(self.cell_at)
+        return self.roles.size
 
     def __getitem__(self, key):
-        if isinstance(key, tuple):
+        if not isinstance(key, State):
             key = State(*key)
-        if cell := self.cell_at.get(key, None):
-            return cell
+        r, c = key
+        if 0 <= r < self.height and 0 <= c < self.width:
+            return Cell(
+                position=key,
+                role=ROLE_FROM_CODE[self.roles.item(r, c)],
+                border=BORDER_FROM_CODE[self.borders.item(r, c)],
+            )
         # If cell not defined, return a wall
         return Cell(position=key, role=Role.WALL, border=Border.NONE)
 
     def __iter__(self):
         """Iterate over map squres"""
-        return iter(self.cell_at.values())
+        return (self[state] for state in self.all_states())
 
     def neighbor_cell(self, cell: Cell, direction: Action) -> Cell:
         return self[cell.position + direction.to_vec()]
@@ -255,29 +297,21 @@ class Map:
             for col in range(self.width):
                 yield State(c=col, r=row)
 
-    # def __iter__(self):
-    #     for pos in self.all_states():
-    #         yield self[pos]
-
     def _complete(self) -> None:
-        for state in self.all_states():
-            square = self[state]
-            assert state == square.position
-            border: Border = Border.NONE
-            for direction in Action:
-                if self._shall_have_border(square, direction):
-                    border |= Border.corresponding_to(direction)
-            self.cell_at[state] = Cell(state, square.role, border)
-
-    def _shall_have_border(self, square: Cell, direction: Action) -> bool:
-        # If the square is a wall, it shall have border in any direction
-        if square.role == Role.WALL:
-            return True
-        # If there is a border, leave it there
-        if Border.corresponding_to(direction) in square.border:
-            return True
-        # Signal border if there is a boundary between EMPTY and WALL
-        neighbor = self.neighbor_cell(square, direction)
-        if square.is_free() != neighbor.is_free():
-            return True
-        return False
+        """Compute the borders of all cells at once.
+
+        A free cell gets a border towards a wall or towards the map boundary,
+        a wall gets borders in all directions. Borders given in the input cells are kept.
+        """
+        is_free = self.roles != WALL_CODE
+        # Surround the map with walls, so that the boundary gets borders as well
+        padded = np.pad(is_free, 1, constant_values=False)
+        neighbor_is_free = {
+            Border.TOP: padded[:-2, 1:-1],
+            Border.RIGHT: padded[1:-1, 2:],
+            Border.BOTTOM: padded[2:, 1:-1],
+            Border.LEFT: padded[1:-1, :-2],
+        }
+        for border, neighbor in neighbor_is_free.items():
+            self.borders[is_free != neighbor] |= np.uint8(border)
+        self.borders[~is_free] = Border.TOP | Border.RIGHT | Border.BOTTOM | Border.LEFT
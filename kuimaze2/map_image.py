@@ -3,9 +3,10 @@ Extension module for converting a kuimaze2.map.Map to and from a bitmap image.
 """
 
 import os
+import numpy as np
 from PIL import Image
 
-from kuimaze2.map import Map, Cell, State, Role
+from kuimaze2.map import Map, Role
 
 
 COLOR_FOR_ROLE_DEFAULT = {
@@ -19,6 +20,21 @@ COLOR_FOR_ROLE_DEFAULT = {
 ROLE_FROM_COLOR_DEFAULT = {value: key for key, value in COLOR_FOR_ROLE_DEFAULT.items()}
 
 
+def _pack_rgb(r, g, b):
+    """Pack RGB components (ints or arrays) into a single integer per pixel."""
+    return (np.uint32(r) << 16) | (np.uint32(g) << 8) | np.uint32(b)
+
+
+def _rgb_from_key(color) -> tuple[int, int, int]:
+    """Return the RGB components of a color key: an RGB(A) tuple or a grayscale int."""
+    if isinstance(color, (int, np.integer)):
+        return color, color, color
+    if isinstance(color, tuple) and len(color) in (3, 4):
+        return color[:3]
+    raise ValueError(
+        f"Color must be an RGB or RGBA tuple or a grayscale int, got {color!r}"
+    )
+
 
 def map_from_image(
         image_fpath: os.PathLike, 
@@ -26,17 +42,22 @@ def map_from_image(
     ) -> Map:
     """Load a map from a bitmap image."""
     role_from_color = role_from_color or ROLE_FROM_COLOR_DEFAULT
-    image = Image.open(image_fpath)
-    cells = []
-    for r in range(image.height):
-        for c in range(image.width):
-            pix_color = image.getpixel((c, r)) # PIL assumes (x, y), not (r, c)
-            if pix_color not in role_from_color:
-                print(f"--- WARNING: No role specified for color: {pix_color} at ({r=}, {c=}). Using Role.EMPTY.")
-            role = role_from_color.get(pix_color, Role.EMPTY)
-            cell = Cell(position=State(r, c), role=role)
-            cells.append(cell)
-    return Map(cells=cells)
+    pixels = np.asarray(Image.open(image_fpath).convert("RGB"))
+    packed = _pack_rgb(pixels[..., 0], pixels[..., 1], pixels[..., 2])
+    code_from_packed = {
+        int(_pack_rgb(*_rgb_from_key(color))): ord(role.value)
+        for color, role in role_from_color.items()
+    }
+    # Translate only the distinct colors, then spread the result over all pixels
+    colors, inverse = np.unique(packed, return_inverse=True)
+    codes = np.empty(len(colors), dtype=np.uint8)
+    for i, color in enumerate(colors.tolist()):
+        if color not in code_from_packed:
+            r, c = np.argwhere(packed == color)[0].tolist()
+            pix_color = tuple(pixels[r, c].tolist())
+            print(f"--- WARNING: No role specified for color: {pix_color} at ({r=}, {c=}). Using Role.EMPTY.")
+        codes[i] = code_from_packed.get(color, ord(Role.EMPTY.value))
+    return Map.from_roles(codes[inverse].reshape(packed.shape))
 
 
 def image_from_map(
@@ -46,12 +67,13 @@ def image_from_map(
     ) -> None:
     """Save a map as a bitmap image."""
     color_for_role = color_for_role or COLOR_FOR_ROLE_DEFAULT
-    image = Image.new("RGB", (map.width, map.height))
-    for r in range(map.height):
-        for c in range(map.width):
-            cell = map[State(r, c)]
-            if cell.role not in color_for_role:
-                print(f"--- WARNING: No color specified for role: {cell.role} at ({r=}, {c=}). Using white.")
-            color = color_for_role.get(cell.role, (255, 255, 255))
-            image.putpixel((c, r), color)
-    image.save(image_fpath)
+    # Palette indexed by the ASCII codes of roles stored in the map
+    palette = np.full((256, 3), 255, dtype=np.uint8)
+    for role, color in color_for_role.items():
+        palette[ord(role.value)] = color
+    for code in np.unique(map.roles).tolist():
+        role = Role(chr(code))
+        if role not in color_for_role:
+            r, c = np.argwhere(map.roles == code)[0].tolist()
+            print(f"--- WARNING: No color specified for role: {role} at ({r=}, {c=}). Using white.")
+    Image.fromarray(palette[map.roles]).save(image_fpath)
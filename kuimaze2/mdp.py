@@ -1,18 +1,23 @@
+import bisect
+import multiprocessing
 import random
 import tkinter as tk
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
 from enum import IntEnum
-from typing import Optional
+from functools import partial
+from types import MappingProxyType
+from typing import Mapping, NamedTuple, Optional
+
+import numpy as np
 
 from kuimaze2 import keyboard
-from kuimaze2.map import Action, Map, State
+from kuimaze2.exceptions import ResetImpossibleError
+from kuimaze2.map import ALL_ACTIONS, Action, Map, State
 from kuimaze2.rendering import QValueCanvas, ValueCanvas
-from kuimaze2.typing import ActionValues
+from kuimaze2.typing import ActionValues, Policy
 
 
-@dataclass(frozen=True)
-class Rewards:
+class Rewards(NamedTuple):
     """Rewards for relevant state roles"""
 
     goal: float = 1.0
@@ -35,16 +40,23 @@ class Confusion(IntEnum):
 class ActionsModel(ABC):
     """Base class for deterministic and stochastic action models."""
 
+    __slots__ = ()
+
     @abstractmethod
     def get_actions_probs(self, action: Action) -> ActionValues: ...
 
     @abstractmethod
     def sample_action(self, action: Action) -> Action: ...
 
+    @abstractmethod
+    def sample_actions(self, actions: np.ndarray) -> np.ndarray: ...
+
 
 class DeterministicActions(ActionsModel):
     """Model of deterministic actions; no confusion."""
 
+    __slots__ = ()
+
     def get_actions_probs(self, action: Action) -> ActionValues:
         """Return the original action with probability 1.0."""
         return {action: 1.0}
@@ -53,10 +65,16 @@ class DeterministicActions(ActionsModel):
         """Return the original action."""
         return action
 
+    def sample_actions(self, actions: np.ndarray) -> np.ndarray:
+        """Return the original actions."""
+        return np.asarray(actions)
+
 
 class StochasticActions(ActionsModel):
     """Model for stochastic actions with possible confusions."""
 
+    __slots__ = ("confusion_probs", "_outcomes", "_cdf", "_probs_by_action")
+
     def __init__(self, forward: float, left: float, right: float, backward: float):
         total = forward + left + right + backward
         assert abs(1 - total) < 1e-6, "Sum of confusion probabilities must be 1.0"
@@ -69,25 +87,74 @@ class StochasticActions(ActionsModel):
             Confusion.BACKWARD: backward,
             Confusion.LEFT: left,
         }
+        self._outcomes = tuple(self.confusion_probs.keys())
+        self._cdf = (forward, forward + right, forward + right + backward, 1.0)
+        self._init_probs_by_action()
+
+    def _init_probs_by_action(self) -> None:
+        # Read-only views; the same mapping is returned on every call
+        self._probs_by_action = {
+            action: MappingProxyType(
+                {
+                    confusion.apply_to(action): prob
+                    for confusion, prob in self.confusion_probs.items()
+                }
+            )
+            for action in ALL_ACTIONS
+        }
+
+    def __getstate__(self):
+        # Mapping proxies cannot be pickled; they are rebuilt after unpickling
+        return self.confusion_probs, self._outcomes, self._cdf
+
+    def __setstate__(self, state):
+        self.confusion_probs, self._outcomes, self._cdf = state
+        self._init_probs_by_action()
 
     def _sample_confusion(self) -> Confusion:
-        return random.choices(
-            list(self.confusion_probs.keys()),
-            weights=list(self.confusion_probs.values()),
-        )[0]
+        # bisect_right skips outcomes with zero probability
+        return self._outcomes[bisect.bisect_right(self._cdf, random.random())]
 
-    def get_actions_probs(self, action: Action) -> ActionValues:
+    def get_actions_probs(self, action: Action) -> Mapping[Action, float]:
         """Return the actual possible actions after applying the confusion, with their probs."""
-        return {
-            confusion.apply_to(action): prob
-            for confusion, prob in self.confusion_probs.items()
-        }
+        return self._probs_by_action[action]
 
     def sample_action(self, action: Action) -> Action:
         """Return an actual action after applying the confusion."""
         confusion = self._sample_confusion()
         return confusion.apply_to(action)
 
+    def sample_actions(self, actions: np.ndarray) -> np.ndarray:
+        """Return actual actions after applying independently sampled confusions."""
+        actions = np.asarray(actions)
+        confusions = np.searchsorted(
+            self._cdf, np.random.random(actions.shape), side="right"
+        )
+        return (actions + confusions) % len(self._outcomes)
+
+
+# The MDP and the policy of rollout_batch(), sent once to each worker process
+_worker_mdp: Optional["MDP"] = None
+_worker_policy: Optional[Policy] = None
+
+
+def _init_rollout_worker(mdp: "MDP", policy: Policy) -> None:
+    global _worker_mdp, _worker_policy
+    _worker_mdp, _worker_policy = mdp, policy
+
+
+def _rollout(seed: int, start: State, max_steps: int) -> list[float]:
+    """Follow the worker's policy from the start state, return the rewards of the steps."""
+    random.seed(seed)
+    state, rewards = start, []
+    for _ in range(max_steps):
+        rewards.append(_worker_mdp.get_reward(state))
+        action = _worker_mdp._actions_model.sample_action(_worker_policy[state])
+        state = _worker_mdp._get_transition_result(state, action)
+        if state is None:
+            break
+    return rewards
+
 
 class MDP:
     """MDP problem class defined over a map with deterministic or stochastic actions."""
@@ -122,11 +189,62 @@ class MDP:
             if not action_probs
             else StochasticActions(**action_probs)
         )
+        self._deterministic = isinstance(self._actions_model, DeterministicActions)
         self._rewards = rewards or Rewards()
         # MDP may redefine goal and danger state in the future
         # Right now, just use those in the map
         self._goals = self._map.goals
         self._dangers = self._map.dangers
+        self._terminals = self._goals | self._dangers
+        self._states = self.get_states()
+        self._state_to_idx = {state: i for i, state in enumerate(self._states)}
+        # Terminal flags indexed like self._states, for vectorized callers
+        self._is_terminal_arr = np.array(
+            [state in self._terminals for state in self._states], dtype=bool
+        )
+        self._init_transitions()
+
+    def _init_transitions(self) -> None:
+        """Precompute the next states and their probabilities for all state-action pairs.
+
+        `_transitions[s][a]` holds the outcomes of action `a` in the state with index `s`.
+        The same data are available as arrays `_next_states` (state indices, -1 for
+        leaving a terminal state) and `_probs`, both of shape (S, 4, K), where K is
+        the number of possible outcomes of an action.
+        """
+        self._transitions = [
+            [
+                tuple(self._compute_next_states_and_probs(state, action))
+                for action in ALL_ACTIONS
+            ]
+            for state in self._states
+        ]
+        n_outcomes = len(self._actions_model.get_actions_probs(Action.UP))
+        shape = (len(self._states), len(ALL_ACTIONS), n_outcomes)
+        self._next_states = np.full(shape, -1, dtype=np.int32)
+        self._probs = np.zeros(shape, dtype=np.float64)
+        for s, state_transitions in enumerate(self._transitions):
+            for a, outcomes in enumerate(state_transitions):
+                for k, (next_state, prob) in enumerate(outcomes):
+                    if next_state is not None:
+                        self._next_states[s, a, k] = self._state_to_idx[next_state]
+                    self._probs[s, a, k] = prob
+        self._state_rewards = np.array(
+            [self.get_reward(state) for state in self._states], dtype=np.float64
+        )
+        # Results of deterministic (actually performed) actions, shape (S, 4)
+        self._action_results = np.array(
+            [
+                [
+                    self._state_to_idx.get(
+                        self._get_transition_result(state, action), -1
+                    )
+                    for action in ALL_ACTIONS
+                ]
+                for state in self._states
+            ],
+            dtype=np.int32,
+        ).reshape(len(self._states), len(ALL_ACTIONS))
 
     def get_states(self) -> list[State]:
         """Return all free states in the MDP problem, including terminals."""
@@ -136,9 +254,9 @@ class MDP:
         """Return all free states in the MDP problem, excluding terminals."""
         return [state for state in self.get_states() if not self.is_terminal(state)]
 
-    def get_actions(self, state: State) -> list[Action]:
-        """Return a list of all possible actions in the given state."""
-        return list(Action)
+    def get_actions(self, state: State) -> tuple[Action, ...]:
+        """Return a tuple of all possible actions in the given state."""
+        return ALL_ACTIONS
 
     def get_reward(self, state: State) -> float:
         """Return reward for leaving a state."""
@@ -158,15 +276,78 @@ class MDP:
         self, state: State, action: Action
     ) -> list[tuple[State | None, float]]:
         """Return a list of possible next states and their probabilities, after applying the action in the state."""
+        idx = self._state_to_idx.get(state)
+        if idx is None:
+            return self._compute_next_states_and_probs(state, action)
+        return list(self._transitions[idx][action])
+
+    def _compute_next_states_and_probs(
+        self, state: State, action: Action
+    ) -> list[tuple[State | None, float]]:
+        if self._deterministic:
+            if state in self._terminals:
+                return [(None, 1.0)]
+            return [(self._map.get_transition_result(state, action), 1.0)]
         actions_probs = self._actions_model.get_actions_probs(action)
         return [
             (self._get_transition_result(state, action), prob)
             for action, prob in actions_probs.items()
         ]
 
+    def step_batch(
+        self, states: np.ndarray, actions: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Apply actions in many states at once, e.g., for parallel rollouts.
+
+        States are given as indices into the list returned by `get_states()`,
+        actions as integers. Return the arrays of next state indices (-1 when leaving
+        a terminal state), rewards for leaving the states, and episode-finished flags.
+        States of finished episodes (-1) must not be passed in again.
+        """
+        states = np.asarray(states)
+        if (states < 0).any():
+            raise ValueError(
+                "MDP: Negative state index; episode finished, start a new one."
+            )
+        actual_actions = self._actions_model.sample_actions(actions)
+        next_states = self._action_results[states, actual_actions]
+        finished = self._is_terminal_arr[states]
+        return next_states, self._state_rewards[states], finished
+
+    def rollout_batch(
+        self,
+        policy: Policy,
+        n_rollouts: int,
+        max_steps: int,
+        start: Optional[State] = None,
+        processes: Optional[int] = None,
+    ) -> list[list[float]]:
+        """Run independent rollouts of the policy in parallel processes.
+
+        Each rollout starts in `start` (the map start state by default) and ends
+        after leaving a terminal state or after `max_steps` steps.
+        Return the list of reward trajectories, i.e., the rewards of individual steps
+        of each rollout.
+        """
+        start = start or self._map.start
+        if not start:
+            raise ResetImpossibleError(
+                "MDP: Unable to determine the start state of rollouts. "
+                "Specify a particular state or define a start state on a map."
+            )
+        seeds = [random.getrandbits(64) for _ in range(n_rollouts)]
+        rollout = partial(_rollout, start=start, max_steps=max_steps)
+        # Spawn fresh workers; forking a process with running threads (e.g. Tk
+        # or Numba thread pools) may deadlock
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(
+            processes, initializer=_init_rollout_worker, initargs=(self, policy)
+        ) as pool:
+            return pool.map(rollout, seeds)
+
     def is_terminal(self, state: State) -> bool:
         """Return True for terminal states, False otherwise."""
-        return self._is_goal(state) or self._is_danger(state)
+        return state in self._terminals
 
     def _is_goal(self, state: State) -> bool:
         """Return True for goal states, False otherwise."""
@@ -188,6 +369,16 @@ class MDPProblem(MDP):
         super().__init__(map, action_probs, rewards)
         self._view = NullMDPView(self) if not graphics else TkMDPView(self)
 
+    def __getstate__(self):
+        # The view (possibly a Tk window) is not sent to other processes
+        state = self.__dict__.copy()
+        del state["_view"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._view = NullMDPView(self)
+
     def render(self, *args, **kwargs):
         """Display/update the graphical representation of the environment
 
@@ -1,8 +1,13 @@
 from dataclasses import astuple, dataclass
+from functools import lru_cache
+from itertools import product
+from operator import itemgetter
 import tkinter as tk
-from typing import Mapping, Self, Callable
+from typing import Iterable, Mapping, NamedTuple, Self, Callable, Sequence
 import random
 
+import numpy as np
+
 
 from kuimaze2.map import Border, Map, State, Action, Role, Cell
 from kuimaze2.typing import QTable
@@ -15,6 +20,21 @@ CIRCLE_DIAMETER = 0.5  # Relative to SQUARE_SIZE
 FONT_FAMILY = "Helvetica"
 
 
+SRGB_GAMMA = 2.2
+# Linear light intensity of each sRGB channel value
+_SRGB_TO_LINEAR: list[float] = ((np.arange(256) / 255) ** SRGB_GAMMA).tolist()
+
+
+def _mix_channel(a: int, b: int, factor: float) -> int:
+    linear = _SRGB_TO_LINEAR[a] * (1 - factor) + _SRGB_TO_LINEAR[b] * factor
+    return round(linear ** (1 / SRGB_GAMMA) * 255)
+
+
+@lru_cache(maxsize=4096)
+def _to_hex(r: int, g: int, b: int) -> str:
+    return f"#{r:02x}{g:02x}{b:02x}"
+
+
 @dataclass(frozen=True)
 class Color:
     r: int
@@ -22,14 +42,15 @@ class Color:
     b: int
 
     def mix(self, other: Self, factor: float) -> Self:
+        """Mix two colors in linear RGB; factor 0 gives self, factor 1 gives other."""
         return Color(
-            int(self.r * (1 - factor) + other.r * factor),
-            int(self.g * (1 - factor) + other.g * factor),
-            int(self.b * (1 - factor) + other.b * factor),
+            _mix_channel(self.r, other.r, factor),
+            _mix_channel(self.g, other.g, factor),
+            _mix_channel(self.b, other.b, factor),
         )
 
     def to_hex(self) -> str:
-        return f"#{self.r:02x}{self.g:02x}{self.b:02x}"
+        return _to_hex(self.r, self.g, self.b)
 
     @staticmethod
     def random() -> Self:
@@ -45,21 +66,58 @@ COLOR_FROM_ROLE: Mapping[Role, Color] = {
     Role.GOAL: Color(0, 255, 0).mix(Color(255, 255, 255), 0.5),  # "#00ff00",
     Role.DANGER: Color(255, 0, 0).mix(Color(255, 255, 255), 0.5),  # "#ff0000",
 }
+HEX_FROM_ROLE: Mapping[Role, str] = {
+    role: color.to_hex() for role, color in COLOR_FROM_ROLE.items()
+}
 DIVIDER_COLOR = Color(204, 204, 204)  # "#cccccc"
+DIVIDER_HEX = DIVIDER_COLOR.to_hex()
 CURRENT_CIRCLE_COLOR = Color(255, 0, 255).mix(Color(255, 255, 255), 0.5)
 NEXT_CIRCLE_COLOR = Color(255, 255, 0)
 FRONTIER_CIRCLE_COLOR = COLOR_FROM_ROLE[Role.GOAL].mix(Color(255, 255, 255), 0.5)
+CURRENT_CIRCLE_HEX = CURRENT_CIRCLE_COLOR.to_hex()
+NEXT_CIRCLE_HEX = NEXT_CIRCLE_COLOR.to_hex()
+FRONTIER_CIRCLE_HEX = FRONTIER_CIRCLE_COLOR.to_hex()
 
 
 class ColorFromValue:
+    LUT_SIZE = 1024
+
     def __init__(self, value_range: tuple[float, float]):
         self.scale = (
             (value_range[0], COLOR_FROM_ROLE[Role.DANGER]),
             (0, Color(255, 255, 255)),
             (value_range[1], COLOR_FROM_ROLE[Role.GOAL]),
         )
+        # Colors of LUT_SIZE values spread over the value range; if the range
+        # contains 0, it maps exactly to the middle entry (white)
+        self.min_value, self.max_value = value_range
+        if self.min_value < 0 < self.max_value:
+            self._value_knots = (self.min_value, 0.0, self.max_value)
+            self._index_knots = (0, self.LUT_SIZE // 2, self.LUT_SIZE - 1)
+        else:
+            self._value_knots = (self.min_value, self.max_value)
+            self._index_knots = (0, self.LUT_SIZE - 1)
+        # Linear segments (first value, slope, first index) between the knots,
+        # the same as used by np.interp() in indices()
+        self._segments = tuple(
+            (x0, (i1 - i0) / (x1 - x0), i0)
+            for x0, x1, i0, i1 in zip(
+                self._value_knots,
+                self._value_knots[1:],
+                self._index_knots,
+                self._index_knots[1:],
+            )
+            if x0 < x1
+        )
+        samples = np.interp(
+            np.arange(self.LUT_SIZE), self._index_knots, self._value_knots
+        )
+        self.lut_colors = [self._interpolate(value) for value in samples.tolist()]
+        self.lut = np.array(
+            [astuple(color) for color in self.lut_colors], dtype=np.uint8
+        )
 
-    def __call__(self, value: float) -> Color:
+    def _interpolate(self, value: float) -> Color:
         if value <= self.scale[0][0]:
             return self.scale[0][1]
         if value >= self.scale[-1][0]:
@@ -74,27 +132,67 @@ class ColorFromValue:
             factor = (value - mid_value) / (max_value - mid_value)
             return mid_color.mix(max_color, factor)
 
+    def indices(self, values: np.ndarray) -> np.ndarray:
+        """Return the LUT indices of the values."""
+        values = np.asarray(values, dtype=np.float64)
+        if self.max_value <= self.min_value:
+            return np.where(values <= self.min_value, 0, self.LUT_SIZE - 1)
+        scaled = np.interp(values, self._value_knots, self._index_knots)
+        return np.rint(scaled).astype(np.intp)
 
-@dataclass(frozen=True)
-class RectCoords:
+    def map_values(self, values: np.ndarray) -> np.ndarray:
+        """Return the RGB colors (uint8 array with an extra axis of size 3) of the values."""
+        return self.lut[self.indices(values)]
+
+    def colors(self, values: Sequence[float]) -> list[Color]:
+        """Return the colors of a sequence of values."""
+        return [self.lut_colors[i] for i in self.indices(values).tolist()]
+
+    def __call__(self, value: float) -> Color:
+        # Scalar version of indices(), without the NumPy call overhead
+        if not self._segments:
+            return self.lut_colors[0 if value <= self.min_value else -1]
+        value = min(max(value, self.min_value), self.max_value)
+        first, last = self._segments[0], self._segments[-1]
+        x0, slope, i0 = last if value >= last[0] else first
+        return self.lut_colors[round(slope * (value - x0) + i0)]
+
+
+class RectCoords(NamedTuple):
     left: int
     top: int
     right: int
     bottom: int
 
-    def __iter__(self):
-        return iter(astuple(self))
-
     def of_border_line(self, border: Border):
-        match border:
-            case Border.TOP:
-                return self.left, self.top, self.right, self.top
-            case Border.RIGHT:
-                return self.right, self.top, self.right, self.bottom
-            case Border.BOTTOM:
-                return self.left, self.bottom, self.right, self.bottom
-            case Border.LEFT:
-                return self.left, self.top, self.left, self.bottom
+        return _BORDER_LINE[border](self)
+
+
+# Coordinates (left, top, right, bottom) picked from RectCoords for its border lines
+_BORDER_LINE = {
+    Border.TOP: itemgetter(0, 1, 2, 1),
+    Border.RIGHT: itemgetter(2, 1, 2, 3),
+    Border.BOTTOM: itemgetter(0, 3, 2, 3),
+    Border.LEFT: itemgetter(0, 1, 0, 3),
+}
+
+
+_TCL_SPECIAL = set(' \t\n\r"$;[]{}\\')
+
+
+def _tcl_word(value) -> str:
+    """Quote a value as a single word of a Tcl command."""
+    if isinstance(value, (tuple, list)):
+        value = " ".join(_tcl_word(item) for item in value)
+    value = str(value)
+    if value and _TCL_SPECIAL.isdisjoint(value):
+        return value
+    if "\\" not in value and value.count("{") == value.count("}") == 0:
+        return "{" + value + "}"
+    return "".join(
+        "\\n" if ch == "\n" else "\\" + ch if ch in _TCL_SPECIAL else ch
+        for ch in value
+    )
 
 
 class MapCanvas(tk.Canvas):
@@ -109,7 +207,15 @@ class MapCanvas(tk.Canvas):
         super().__init__(parent, width=canvas_width, height=canvas_height, **kwargs)
         self.map: Map = map
         self.square_size = sq_size
+        # Pixel coordinates of the left sides of columns and the tops of rows
+        self._lefts = MARGIN_SIZE + sq_size * np.arange(map.width)
+        self._tops = MARGIN_SIZE + sq_size * np.arange(map.height)
+        # Pixel coordinates (x, y) of the square centers, indexed by [row, column]
+        half = sq_size // 2
+        self._centers = np.stack(np.meshgrid(self._lefts + half, self._tops + half), -1)
         self.texts = {}
+        # The last fill colors set by _set_fill_colors(), by item id
+        self._fills: dict[int, str] = {}
         self.font_size = max(2, int(0.2 * self.square_size))
 
     def draw(self):
@@ -119,66 +225,85 @@ class MapCanvas(tk.Canvas):
         self.draw_square_texts()
 
     def _coords_from_position(self, pos: State) -> RectCoords:
-        left = MARGIN_SIZE + self.square_size * pos.c
-        top = MARGIN_SIZE + self.square_size * pos.r
+        left = self._lefts.item(pos.c)
+        top = self._tops.item(pos.r)
         return RectCoords(left, top, left + self.square_size, top + self.square_size)
 
     def _center_from_position(self, pos: State) -> tuple[int, int]:
-        rect = self._coords_from_position(pos)
-        return int((rect.left + rect.right) / 2), int((rect.top + rect.bottom) / 2)
+        half = self.square_size // 2
+        return self._lefts.item(pos.c) + half, self._tops.item(pos.r) + half
+
+    def _create_items(
+        self, items: Iterable[tuple[str, Sequence, dict]]
+    ) -> list[int]:
+        """Create canvas items given as (type, coords, options) by a single Tcl script.
+
+        Return the ids of the created items.
+        """
+        commands = []
+        for item_type, coords, options in items:
+            words = [self._w, "create", item_type, *coords]
+            for name, value in options.items():
+                words += [f"-{name}", value]
+            commands.append("[" + " ".join(map(_tcl_word, words)) + "]")
+        if not commands:
+            return []
+        ids = self.tk.splitlist(self.tk.eval("list " + " ".join(commands)))
+        return [int(id) for id in ids]
 
     def draw_borders(self):
-        for sq in self.map:
-            self.draw_border(sq)
+        border_items = self._border_items
+        self._create_items(item for sq in self.map for item in border_items(sq))
 
-    def draw_border(self, square: Cell):
+    def _border_items(self, square: Cell):
         coords = self._coords_from_position(square.position)
-        color = COLOR_FROM_ROLE[Role.WALL].to_hex()
+        options = dict(fill=HEX_FROM_ROLE[Role.WALL], width=5, capstyle="round")
         for border in Border:
             if border in square.border:
-                line_coords = coords.of_border_line(border)
-                self.create_line(*line_coords, fill=color, width=5, capstyle="round")
+                yield "line", coords.of_border_line(border), options
+
+    def draw_border(self, square: Cell):
+        self._create_items(self._border_items(square))
+
+    def _index_offset(self, index: int) -> int:
+        return MARGIN_SIZE + self.square_size * index + self.square_size // 2
+
+    def _index_text(self, x: int, y: int, index: int):
+        font = (FONT_FAMILY, self.font_size)
+        return "text", (x, y), dict(text=str(index), font=font)
 
     def draw_row_indices(self):
-        for row in range(self.map.height):
-            self.create_text(
+        self._create_items(
+            self._index_text(x, self._index_offset(row), row)
+            for row in range(self.map.height)
+            for x in (
                 MARGIN_SIZE // 2,
-                MARGIN_SIZE + self.square_size * row + self.square_size // 2,
-                text=str(row),
-                font=(FONT_FAMILY, self.font_size),
-            )
-            self.create_text(
                 MARGIN_SIZE + self.square_size * self.map.width + MARGIN_SIZE // 2,
-                MARGIN_SIZE + self.square_size * row + self.square_size // 2,
-                text=str(row),
-                font=(FONT_FAMILY, self.font_size),
             )
+        )
 
     def draw_col_indices(self):
-        for col in range(self.map.width):
-            self.create_text(
-                MARGIN_SIZE + self.square_size * col + self.square_size // 2,
+        self._create_items(
+            self._index_text(self._index_offset(col), y, col)
+            for col in range(self.map.width)
+            for y in (
                 MARGIN_SIZE // 2,
-                text=str(col),
-                font=(FONT_FAMILY, self.font_size),
-            )
-            self.create_text(
-                MARGIN_SIZE + self.square_size * col + self.square_size // 2,
                 MARGIN_SIZE + self.square_size * self.map.height + MARGIN_SIZE // 2,
-                text=str(col),
-                font=(FONT_FAMILY, self.font_size),
             )
+        )
 
     def draw_square_texts(self, texts=None, default_text=""):
         texts = texts or {}
+        font = (FONT_FAMILY, self.font_size)
+        items = []
         for sq in self.map:
             text = texts.get(sq.position, default_text)
             coords = self._coords_from_position(sq.position)
             left = coords.left + self.square_size // 2
             top = coords.top + self.square_size // 2
-            self.texts[sq.position] = self.create_text(
-                left, top, text=text, font=(FONT_FAMILY, self.font_size)
-            )
+            items.append(("text", (left, top), dict(text=text, font=font)))
+        ids = self._create_items(items)
+        self.texts.update(zip((sq.position for sq in self.map), ids))
 
     def set_square_text(self, position: State, text: str):
         self.itemconfig(self.texts[position], text=text)
@@ -187,6 +312,23 @@ class MapCanvas(tk.Canvas):
         for position, text in texts.items():
             self.set_square_text(position, text)
 
+    def _set_fill_colors(self, item_colors: Iterable[tuple[int, Color | str]]):
+        """Set fill colors of items given by their ids, by a single Tcl script.
+
+        Items which already have the color are skipped.
+        """
+        fills = self._fills
+        prefix = _tcl_word(self._w) + " itemconfigure "
+        commands = []
+        for item, color in item_colors:
+            # Hex strings of Colors need no quoting
+            hex_color = _tcl_word(color) if isinstance(color, str) else color.to_hex()
+            if fills.get(item) != hex_color:
+                fills[item] = hex_color
+                commands.append(f"{prefix}{item} -fill {hex_color}")
+        if commands:
+            self.tk.eval("\n".join(commands))
+
 
 class SquareCanvas(MapCanvas):
 
@@ -196,6 +338,10 @@ class SquareCanvas(MapCanvas):
         self.circles = {}
         self.path_line = None
         self.state_action_arrow = None
+        # Squares whose color may be changed when role colors shall be kept
+        self._empty_positions = {
+            cell.position for cell in map if cell.role == Role.EMPTY
+        }
         self.draw()
 
     def draw(self):
@@ -210,22 +356,24 @@ class SquareCanvas(MapCanvas):
 
     def draw_squares(self):
         """Draw all squares in the map, parts that can change color based on value"""
+        draw_square = self.draw_square
         for sq in self.map:
-            self.draw_square(sq)
+            draw_square(sq)
 
     def draw_square(self, square: Cell):
         coords = self._coords_from_position(square.position)
         self.squares[square.position] = self.create_rectangle(
             *coords,
-            fill=COLOR_FROM_ROLE[square.role].to_hex(),
-            outline=DIVIDER_COLOR.to_hex(),
+            fill=HEX_FROM_ROLE[square.role],
+            outline=DIVIDER_HEX,
             width=3,
         )
 
     def draw_circles(self):
         """Draw all squares in the map, parts that can change color based on value"""
+        draw_circle = self.draw_circle
         for sq in self.map:
-            self.draw_circle(sq)
+            draw_circle(sq)
 
     def draw_circle(self, square: Cell):
         coords = self._coords_from_position(square.position)
@@ -281,23 +429,25 @@ class SquareCanvas(MapCanvas):
         )
 
     def draw_path(self, path: list[State]):
-        points = []
-        for state in path:
-            sq_center = self._center_from_position(state)
-            points.extend(sq_center[:])
-        self.coords(self.path_line, points)
+        rows = np.fromiter((state.r for state in path), np.intp, len(path))
+        cols = np.fromiter((state.c for state in path), np.intp, len(path))
+        self.coords(self.path_line, self._centers[rows, cols].ravel().tolist())
         self.itemconfig(self.path_line, state=tk.NORMAL)
 
     def hide_path(self):
         self.itemconfig(self.path_line, state=tk.HIDDEN)
 
-    def set_square_color(self, position: State, color: Color):
-        self.itemconfig(self.squares[position], fill=color.to_hex())
+    def set_square_color(self, position: State, color: Color | str):
+        """Set the square color, given as a Color or a hex string."""
+        self._set_fill_colors([(self.squares[position], color)])
 
-    def set_circle_color(self, position: State, color: Color, visible: bool = True):
+    def set_circle_color(
+        self, position: State, color: Color | str, visible: bool = True
+    ):
+        """Set the circle color (a Color or a hex string) and its visibility."""
         self.itemconfig(
             self.circles[position],
-            fill=color.to_hex(),
+            fill=color if isinstance(color, str) else color.to_hex(),
             state=tk.NORMAL if visible else tk.HIDDEN,
         )
 
@@ -307,10 +457,11 @@ class SquareCanvas(MapCanvas):
         )
 
     def set_square_colors(self, colors: dict[State, Color], keep_role_colors=False):
-        for position, color in colors.items():
-            if keep_role_colors and self.map[position].role != Role.EMPTY:
-                continue
-            self.set_square_color(position, color)
+        self._set_fill_colors(
+            (self.squares[position], color)
+            for position, color in colors.items()
+            if not keep_role_colors or position in self._empty_positions
+        )
 
 
 class TriangleCanvas(MapCanvas):
@@ -330,11 +481,12 @@ class TriangleCanvas(MapCanvas):
         self.draw_square_texts()
 
     def draw_triangles(self):
+        draw_triangle = self.draw_triangle
         for sq in self.map:
             if sq.is_free():
                 self.triangles[sq.position] = {}
                 for action in Action:
-                    self.draw_triangle(sq, action)
+                    draw_triangle(sq, action)
             elif sq.role == Role.WALL:
                 self.draw_square(sq)
             else:
@@ -344,8 +496,8 @@ class TriangleCanvas(MapCanvas):
         coords = self._tr_coords(square, action)
         self.triangles[square.position][action] = self.create_polygon(
             *coords,
-            fill=Color(255, 255, 255).to_hex(),
-            outline=DIVIDER_COLOR.to_hex(),
+            fill=HEX_FROM_ROLE[Role.EMPTY],
+            outline=DIVIDER_HEX,
         )
 
     def _tr_coords(self, square: Cell, action: Action):
@@ -359,32 +511,37 @@ class TriangleCanvas(MapCanvas):
         # We will not store the squares, they are not needed
         self.create_rectangle(
             *coords,
-            fill=COLOR_FROM_ROLE[square.role].to_hex(),
-            outline=DIVIDER_COLOR.to_hex(),
+            fill=HEX_FROM_ROLE[square.role],
+            outline=DIVIDER_HEX,
             width=3,
         )
 
     def set_triangle_color(self, position: State, action: Action, color: Color):
-        self.itemconfig(self.triangles[position][action], fill=color.to_hex())
+        self._set_fill_colors([(self.triangles[position][action], color)])
 
     def set_triangle_colors(self, colors: dict[(State, Action), Color]):
-        for (position, action), color in colors.items():
-            self.set_triangle_color(position, action, color)
+        self._set_fill_colors(
+            (self.triangles[position][action], color)
+            for (position, action), color in colors.items()
+        )
 
     def draw_triangle_texts(self, texts=None, default_text=""):
         texts = texts or {}
-        for sq in self.map:
-            middle = self._center_from_position(sq.position)
-            for action in Action:
-                text = texts.get((sq.position, action), default_text)
-                left = middle[0] + action.to_vec().c * self.square_size * 0.3
-                top = middle[1] + action.to_vec().r * self.square_size * 0.3
-                self.triangle_texts[(sq.position, action)] = self.create_text(
-                    left,
-                    top,
-                    text=text,
-                    font=(FONT_FAMILY, round(self.font_size * 0.6)),
-                )
+        font = (FONT_FAMILY, round(self.font_size * 0.6))
+        sq_size = self.square_size
+        # Text offsets from the square center, the same for all squares
+        offsets = []
+        for action in Action:
+            vec = action.to_vec()
+            offsets.append((action, vec.c * sq_size * 0.3, vec.r * sq_size * 0.3))
+        center_from_position = self._center_from_position
+        centers = [(sq.position, center_from_position(sq.position)) for sq in self.map]
+        keys, items = [], []
+        for (position, (x, y)), (action, dx, dy) in product(centers, offsets):
+            text = texts.get((position, action), default_text)
+            keys.append((position, action))
+            items.append(("text", (x + dx, y + dy), dict(text=text, font=font)))
+        self.triangle_texts.update(zip(keys, self._create_items(items)))
 
     def set_triangle_text(self, position: State, action: Action, text: str):
         self.itemconfig(self.triangle_texts[position, action], text=text)
@@ -418,23 +575,26 @@ class SearchCanvas(SquareCanvas):
         return color
 
     def set_square_colors_from_values(self, colors: dict[State, float]):
-        colors = {
-            position: self.color_from_value(value) for position, value in colors.items()
-        }
-        self.set_square_colors(colors, keep_role_colors=True)
+        self._set_fill_colors(
+            (self.squares[position], self.color_from_value(value))
+            for position, value in colors.items()
+            if position in self._empty_positions
+        )
 
     def set_square_colors_from_visited(self, visited):
         color = COLOR_FROM_ROLE[Role.START].mix(Color(255, 255, 255), 0.5)
-        colors = {position: color for position in visited}
-        self.set_square_colors(colors, keep_role_colors=True)
+        self._set_fill_colors(
+            (self.squares[position], color)
+            for position in visited
+            if position in self._empty_positions
+        )
 
     def set_current_state(self, state: State = None):
         if self.current_circle:
             self.set_circle_visibility(self.current_circle, False)
         self.current_circle = state
         if state:
-            self.set_circle_color(state, CURRENT_CIRCLE_COLOR)
-            self.set_circle_visibility(state, True)
+            self.set_circle_color(state, CURRENT_CIRCLE_HEX)
 
     def set_next_states(self, next_states: list[State] = []):
         self.reset_next_states()
@@ -442,14 +602,13 @@ class SearchCanvas(SquareCanvas):
             self.add_next_state(state)
 
     def add_next_state(self, state: State):
-        self.set_circle_color(state, NEXT_CIRCLE_COLOR)
-        self.set_circle_visibility(state, True)
+        self.set_circle_color(state, NEXT_CIRCLE_HEX)
         self.next_circles.append(state)
 
     def reset_next_states(self):
         for state in self.next_circles:
             if state in self.frontier_circles:
-                self.set_circle_color(state, FRONTIER_CIRCLE_COLOR)
+                self.set_circle_color(state, FRONTIER_CIRCLE_HEX)
             else:
                 self.set_circle_visibility(state, False)
         self.next_circles = []
@@ -460,8 +619,7 @@ class SearchCanvas(SquareCanvas):
             self.add_frontier_state(state)
 
     def add_frontier_state(self, state: State):
-        self.set_circle_color(state, FRONTIER_CIRCLE_COLOR)
-        self.set_circle_visibility(state, True)
+        self.set_circle_color(state, FRONTIER_CIRCLE_HEX)
         self.frontier_circles.append(state)
 
     def reset_frontier_states(self):
@@ -490,10 +648,9 @@ class ValueCanvas(SquareCanvas):
         self.color_from_value = ColorFromValue(value_range)
 
     def set_square_colors_from_values(self, values: dict[State, float]):
-        colors = {
-            position: self.color_from_value(value) for position, value in values.items()
-        }
-        self.set_square_colors(colors)
+        colors = self.color_from_value.colors(list(values.values()))
+        squares = self.squares
+        self._set_fill_colors(zip((squares[pos] for pos in values), colors))
 
 
 class QValueCanvas(TriangleCanvas):
@@ -516,8 +673,10 @@ class QValueCanvas(TriangleCanvas):
         self.color_from_value = ColorFromValue(value_range)
 
     def set_triangle_colors_from_qvalues(self, qvalues: QTable):
-        colors = {}
+        items, values = [], []
         for state, action_values in qvalues.items():
+            triangles = self.triangles[state]
             for action, value in action_values.items():
-                colors[state, action] = self.color_from_value(value)
-        self.set_triangle_colors(colors)
+                items.append(triangles[action])
+                values.append(value)
+        self._set_fill_colors(zip(items, self.color_from_value.colors(values)))
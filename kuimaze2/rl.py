@@ -1,6 +1,10 @@
+from itertools import accumulate
 import random
 from typing import Optional
 
+import numpy as np
+
+from kuimaze2.map import ALL_ACTIONS
 from kuimaze2.mdp import MDP, Action, State, ActionValues, NullMDPView, TkMDPView
 from kuimaze2.exceptions import NeedsResetError, ResetImpossibleError
 
@@ -13,6 +17,31 @@ class RLProblem:
         self._current_state = next(iter(self._mdp._goals))
         self._episode_finished = True
         self._view = NullMDPView(self._mdp) if not graphics else TkMDPView(self._mdp)
+        # Bound methods of the MDP used in every step
+        self._is_terminal = self._mdp.is_terminal
+        self._get_reward = self._mdp.get_reward
+        self._sample_actual_action = self._mdp._actions_model.sample_action
+        self._get_transition_result = self._mdp._get_transition_result
+        if not graphics:
+            # Calls of render() in training loops go straight to the no-op view
+            self.render = self._view.render
+
+    def __getstate__(self):
+        # The view (possibly a Tk window) is not sent to other processes
+        state = self.__dict__.copy()
+        del state["_view"]
+        state.pop("render", None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._view = NullMDPView(self._mdp)
+        self.render = self._view.render
+
+    @property
+    def headless(self) -> bool:
+        """Return True if the environment has no graphics; render() does nothing."""
+        return isinstance(self._view, NullMDPView)
 
     def reset(
         self, /, state: Optional[State] = None, random_start: bool = False
@@ -41,18 +70,16 @@ class RLProblem:
 
     def get_action_space(self) -> list[Action]:
         """Return the union of all actions applicable in any state (except the EXIT action)"""
-        return [action for action in Action]
+        return list(ALL_ACTIONS)
 
     def sample_action(self, action_probs: Optional[ActionValues] = None) -> Action:
         """Return a random action from the action space"""
         if not action_probs:
-            return random.choice(self.get_action_space())
-        assert sum(action_probs.values()) == 1
-        return random.choices(
-            list(action_probs.keys()), weights=list(action_probs.values())
-        )[
-            0
-        ]  # Intentional: take the first item, random.choices() always returns a list
+            return random.choice(ALL_ACTIONS)
+        cum_weights = list(accumulate(action_probs.values()))
+        assert abs(cum_weights[-1] - 1) < 1e-9
+        # Drawing a single action; random.choices() always returns a list
+        return random.choices(tuple(action_probs), cum_weights=cum_weights)[0]
 
     def step(self, action: Action) -> tuple[State, float, bool]:
         """Take a single step in the environment"""
@@ -60,16 +87,27 @@ class RLProblem:
             raise NeedsResetError(
                 "RLProblem: Episode terminated. You must call reset() first."
             )
+        state = self._current_state
         # If we are going to make a step from terminal, then we are done
-        if self._mdp.is_terminal(self._current_state):
+        if self._is_terminal(state):
             self._episode_finished = True
-        reward = self._mdp.get_reward(self._current_state)
-        actual_action = self._mdp._actions_model.sample_action(action)
-        self._current_state = self._mdp._get_transition_result(
-            self._current_state, actual_action
-        )
+        reward = self._get_reward(state)
+        actual_action = self._sample_actual_action(action)
+        self._current_state = self._get_transition_result(state, actual_action)
         return self._current_state, reward, self._episode_finished
 
+    def step_batch(
+        self, states: np.ndarray, actions: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Take a single step in many independent environment copies at once.
+
+        States are given as indices into the list returned by `get_states()`,
+        actions as integers (`Action` values). Return the arrays of next state indices
+        (-1 when the episode terminated), rewards, and episode-terminated flags.
+        The current state and episode of the environment are not affected.
+        """
+        return self._mdp.step_batch(states, actions)
+
     def render(self, *args, **kwargs):
         """Display/update the graphical representation of the environment
 
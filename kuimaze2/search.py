@@ -1,9 +1,8 @@
 from abc import ABC, abstractmethod
-from copy import deepcopy
 from typing import Optional, Mapping
 import tkinter as tk
 
-from kuimaze2.map import Map, State, Action, Role
+from kuimaze2.map import ALL_ACTIONS, Map, State, Action, Role
 from kuimaze2.rendering import SearchCanvas
 from kuimaze2 import keyboard
 
@@ -43,6 +42,10 @@ class SearchProblem:
         self._start: State = self.map.start
         self._goals: set[State] = self.map.goals
         self._costs: StateRoleCosts = costs or DEFAULT_COSTS
+        # Costs of leaving the individual cells
+        self._cell_costs: dict[State, float] = {
+            cell.position: self._costs[cell.role] for cell in self.map
+        }
         self._visited: set[State] = set()
         self._view: SearchView = (
             NullSearchView(self) if not graphics else TkSearchView(self)
@@ -59,7 +62,8 @@ class SearchProblem:
 
     def get_goals(self) -> set[State]:
         """Return the set of goal states as specified in the map."""
-        return deepcopy(self._goals)
+        # States are immutable, a shallow copy protects the goals
+        return set(self._goals)
 
     def is_goal(self, state):
         """Return True if the state is one of the goals."""
@@ -70,7 +74,7 @@ class SearchProblem:
 
         For this maze problem, all 4 actions are possible in every state.
         """
-        return list(Action) if self.map[state].is_free() else []
+        return list(ALL_ACTIONS) if self.map[state].is_free() else []
 
     def get_transition_result(
         self, state: State, action: Action
@@ -84,7 +88,11 @@ class SearchProblem:
         return (successor, self._get_cost(state))
 
     def _get_cost(self, state: State) -> float:
-        return self._costs[self.map[state].role]
+        cost = self._cell_costs.get(state)
+        if cost is None:
+            # Outside the map
+            return self._costs[self.map[state].role]
+        return cost
 
     def render(self, *args, **kwargs):
         """Display/update the graphical representation of the environment
@@ -132,6 +140,14 @@ class SearchProblem:
         """
         self._view.render(*args, **kwargs)
 
+    def flush(self):
+        """Display the pending graphical updates from the previous calls of `render()`.
+
+        To save time, the window is redrawn only after several renders
+        or when `render()` waits for a key press.
+        """
+        self._view.flush()
+
 
 class SearchView(ABC):
 
@@ -142,6 +158,9 @@ class SearchView(ABC):
     def render(self, *args, **kwargs):
         pass
 
+    def flush(self):
+        pass
+
 
 class NullSearchView(SearchView):
     """'Fake' SearchView subclass that does nothing"""
@@ -154,6 +173,9 @@ class NullSearchView(SearchView):
 class TkSearchView(SearchView):
     """SearchView with Tkinter as backend"""
 
+    # Number of intermediate renders after which the Tk window is redrawn
+    FLUSH_EVERY = 16
+
     def __init__(self, env: SearchProblem):
         self.env = env
         self.tk = tk.Tk()
@@ -161,6 +183,7 @@ class TkSearchView(SearchView):
         self.tk.geometry("+0+0")
         self.canvas = SearchCanvas(self.tk, map=self.env.map)
         self.canvas.pack()
+        self._pending_renders = 0
 
     def render(
         self,
@@ -184,9 +207,17 @@ class TkSearchView(SearchView):
             self.canvas.draw_path(path)
         if texts:
             self.canvas.update_square_texts(texts)
-        self.tk.update()
         if use_keyboard is not None:
             keyboard.STEPS_TO_SKIP = 0
             keyboard.SKIP = not use_keyboard
+        self._pending_renders += 1
+        # Only intermediate renders are throttled; renders requesting a wait
+        # (even when skipped by the keyboard) and paths are shown at once
+        if wait or path or self._pending_renders >= self.FLUSH_EVERY:
+            self.flush()
         if wait:
             keyboard.wait()
+
+    def flush(self):
+        self.tk.update()
+        self._pending_renders = 0
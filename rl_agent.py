@@ -1,13 +1,113 @@
+from itertools import product
+from math import ceil
+import multiprocessing
 import random
 from typing import Optional
 
+import numpy as np
+
 from kuimaze2 import Action, RLProblem, State
 from kuimaze2.typing import Policy, QTable, VTable
 
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
 T_MAX = 200  # Max steps in episode
 MAX_EPISODES = 1000  # Max number of episodes
 
 
+def q_update(
+    q_table: np.ndarray,
+    s: int,
+    a: int,
+    reward: float,
+    next_s: int,
+    gamma: float,
+    alpha: float,
+) -> None:
+    """
+    Apply the Q-learning update rule to the Q-table in place
+    S, A: The indices of the state and the action
+    Next_s: The index of the next state, -1 if the episode finished
+    """
+    # Max Q-value for the next state
+    next_max_q = 0.0
+    if next_s >= 0:
+        next_max_q = q_table[next_s].max()
+
+    # Update TD target
+    td_target = reward + gamma * next_max_q
+
+    td_error = td_target - q_table[s, a]
+
+    # Update Q-value
+    q_table[s, a] += alpha * td_error
+
+
+def q_backward_update(
+    q_table: np.ndarray,
+    states: np.ndarray,
+    actions: np.ndarray,
+    rewards: np.ndarray,
+    next_states: np.ndarray,
+    gamma: float,
+    alpha: float,
+) -> None:
+    """
+    Apply the Q-learning update to the transitions of an episode, from the last one
+    States, actions, rewards, next_states: Arrays describing the transitions
+    """
+    for t in range(len(states) - 1, -1, -1):
+        q_update(
+            q_table, states[t], actions[t], rewards[t], next_states[t], gamma, alpha
+        )
+
+
+if njit is not None:
+    # Compiled for the given types when the module is imported; with cache=True,
+    # later imports load the machine code from the on-disk cache
+    q_update = njit("void(f4[:, :], i8, i8, f4, i8, f4, f4)", cache=True)(q_update)
+    q_backward_update = njit(
+        "void(f4[:, :], i8[:], i8[:], f4[:], i8[:], f4, f4)", cache=True
+    )(q_backward_update)
+
+
+# The agent of learn_policy_parallel(), sent once to each worker process
+_worker_agent: Optional["RLAgent"] = None
+
+
+def _init_training_worker(agent: "RLAgent") -> None:
+    global _worker_agent
+    _worker_agent = agent
+
+
+def _train_episodes(
+    q_table: np.ndarray,
+    epsilon: float,
+    epsilon_decay: float,
+    n_episodes: int,
+    seed: int,
+) -> tuple[np.ndarray, list[float]]:
+    """
+    Run episodes of the worker's agent, starting from the given Q-table and epsilon
+    Returns: The updated Q-table and the total rewards of the episodes
+    """
+    agent = _worker_agent
+    random.seed(seed)
+    agent.rng = np.random.default_rng(seed)
+    agent.q_table[:] = q_table
+    agent.current_epsilon = epsilon
+    rewards = []
+    for _ in range(n_episodes):
+        agent.current_epsilon = max(
+            agent.epsilon_min, agent.current_epsilon * epsilon_decay
+        )
+        rewards.append(agent.run_episode())
+    return agent.q_table, rewards
+
+
 class RLAgent:
     """Implementation of Q-learning algorithM for fiding optimal policy in an environment"""
 
@@ -16,8 +116,12 @@ class RLAgent:
         env: RLProblem,
         gamma: float = 0.9,
         alpha: float = 0.1,
+        seed: Optional[int] = None,
     ):
         self.env = env
+        self.rng = np.random.default_rng(seed)
+        # Without graphics, rendering would only format texts nobody sees
+        self.headless = env.headless
         self.gamma = gamma
         self.alpha = alpha
         self.epsilon = 1.0
@@ -27,18 +131,48 @@ class RLAgent:
         self.init_q_table()
 
     def init_q_table(self) -> None:
-        """Create and initialize the Q-table with zeros"""
-        self.q_table = {
-            state: {action: 0.0 for action in self.env.get_action_space()}
-            for state in self.env.get_states()
+        """
+        Create and initialize the Q-table with zeros
+
+        The Q-table is an array of shape (number of states, number of actions),
+        rows and columns correspond to self.states and self.actions.
+        """
+        self.states = self.env.get_states()
+        self.actions = tuple(self.env.get_action_space())
+        self.state_idx = {state: i for i, state in enumerate(self.states)}
+        self.action_idx = {action: i for i, action in enumerate(self.actions)}
+        # Keys of the Q-table entries, in the order of self.q_table.ravel()
+        self.state_actions = list(product(self.states, self.actions))
+        # Single precision is plenty for Q-values and halves the memory traffic
+        self.q_table = np.zeros((len(self.states), len(self.actions)), np.float32)
+        # Transitions of an episode (state, action, reward, next state) by steps
+        self.trajectory_states = np.zeros(T_MAX, dtype=np.int64)
+        self.trajectory_actions = np.zeros(T_MAX, dtype=np.int64)
+        self.trajectory_rewards = np.zeros(T_MAX, np.float32)
+        self.trajectory_next_states = np.zeros(T_MAX, dtype=np.int64)
+
+    def backward_update(self, n_steps: int) -> None:
+        """Update the Q-values by the first n_steps transitions of the trajectory"""
+        q_backward_update(
+            self.q_table,
+            self.trajectory_states[:n_steps],
+            self.trajectory_actions[:n_steps],
+            self.trajectory_rewards[:n_steps],
+            self.trajectory_next_states[:n_steps],
+            self.gamma,
+            self.alpha,
+        )
+
+    def get_q_values(self) -> QTable:
+        """Return the Q-table as a dictionary, e.g., for rendering"""
+        return {
+            state: dict(zip(self.actions, q_values))
+            for state, q_values in zip(self.states, self.q_table.tolist())
         }
 
     def get_values(self) -> VTable:
         """Return the state values derived from the q-table"""
-        return {
-            state: max(q_values.values()) 
-            for state, q_values in self.q_table.items()
-        }
+        return dict(zip(self.states, self.q_table.max(axis=1).tolist()))
 
     def get_best_action_for_state(self, state: State) -> Action:
         """
@@ -48,9 +182,9 @@ class RLAgent:
         
         Return: The action with the highest Q-value for given state
         """
-        q_values = self.q_table[state]
+        q_values = self.q_table[self.state_idx[state]]
 
-        return max(q_values, key=q_values.get)
+        return self.actions[q_values.argmax()]
     
     def choose_action(self, state: State) -> Action:
         """
@@ -62,8 +196,8 @@ class RLAgent:
         """
 
         # Explore with probability epsilon
-        if random.random() < self.current_epsilon:
-            return random.choice(self.env.get_action_space())
+        if self.rng.random() < self.current_epsilon:
+            return self.actions[self.rng.integers(len(self.actions))]
         # Exploit with probability 1 - epsilon
         else:
             return self.get_best_action_for_state(state)
@@ -76,21 +210,9 @@ class RLAgent:
         Reward: The reward 
         Next_state: The next state
         """
-        # Current Q-value
-        current_q = self.q_table[state][action]
-
-        # Max Q-value for the next state
-        next_max_q = 0.0
-        if next_state is not None:
-            next_max_q = max(self.q_table[next_state].values())
-
-        # Update TD target 
-        td_target = reward + self.gamma * next_max_q
-
-        td_error = td_target - current_q
-
-        # Update Q-value
-        self.q_table[state][action] = current_q + self.alpha * td_error
+        s, a = self.state_idx[state], self.action_idx[action]
+        next_s = -1 if next_state is None else self.state_idx[next_state]
+        q_update(self.q_table, s, a, float(reward), next_s, self.gamma, self.alpha)
 
 
     def render(
@@ -104,18 +226,24 @@ class RLAgent:
         **kwargs,
     ) -> None:
         """Visualize the state of the algorithm"""
+        if self.headless:
+            return
         values = values or self.get_values()
-        q_values = q_values or self.q_table
         # State values will be displayed in the squares
         sq_texts = (
             {state: f"{value:.2f}" for state, value in values.items()} if values else {}
         )
         # State-action value will be displayed in the triangles
-        tr_texts = {
-            (state, action): f"{value:.2f}"
-            for state, action_values in q_values.items()
-            for action, value in action_values.items()
-        }
+        if q_values:
+            tr_texts = {
+                (state, action): f"{value:.2f}"
+                for state, action_values in q_values.items()
+                for action, value in action_values.items()
+            }
+        else:
+            q_values = self.get_q_values()
+            texts = map("{:.2f}".format, self.q_table.ravel().tolist())
+            tr_texts = dict(zip(self.state_actions, texts))
         # If policy is given, it will be displayed in the middle
         # of the squares in the "triangular" view
         actions = {}
@@ -142,49 +270,73 @@ class RLAgent:
         Extract policy from Q-values
         Returns: A policy that maps states to actions
         """
+        best_actions = self.q_table.argmax(axis=1).tolist()
         policy = {
-            state: self.get_best_action_for_state(state)
-            for state in self.env.get_states()
+            state: self.actions[a] for state, a in zip(self.states, best_actions)
         }
         return policy
     
     def run_episode(self, render: bool = False) -> float:
         """
         Run a single episode of Q-learning
+
+        The Q-values are updated after the episode, backwards from its end
+        (Episodic Backward Update), so the final reward propagates along
+        the whole trajectory at once.
         Render: Whether to render the episode
         Returns: The total reward of the episode
         """
         total_reward = 0
         episode_finished = False
         t = 0
+        # Random draws for the epsilon-greedy strategy, for all steps at once
+        explore = (self.rng.random(T_MAX) < self.current_epsilon).tolist()
+        random_actions = self.rng.integers(len(self.actions), size=T_MAX).tolist()
+        # The Q-table changes only after the episode, and so do the greedy actions
+        greedy_actions = self.q_table.argmax(axis=1).tolist()
+
+        # States and actions are handled as indices in the Q-table,
+        # translated only when communicating with the environment
+        step, actions, state_idx = self.env.step, self.actions, self.state_idx
 
         # Reset the environment and get the initial state
-        state = self.env.reset()
-        path = [state]
+        s = state_idx[self.env.reset()]
+        path = [s]
         
         while not episode_finished and t < T_MAX:
-            t += 1
-
             # Choose an action using epsilon-greedy strategy
-            action = self.choose_action(state)
+            a = random_actions[t] if explore[t] else greedy_actions[s]
             
             # Take the action and observe the next state and reward
-            next_state, reward, episode_finished = self.env.step(action)
+            next_state, reward, episode_finished = step(actions[a])
+            next_s = -1 if next_state is None else state_idx[next_state]
             total_reward += reward
-            
-            if next_state is not None:
-                path.append(next_state)
 
-            # Update Q-value using q-learning update rule
-            self.update_q_value(state, action, reward, next_state)
-            
-            # Render if requested
-            if render:
-                policy = self.extract_policy()
-                self.render(current_state=state, action=action, path=path, policy=policy)
+            # Store the transition for the update after the episode
+            self.trajectory_states[t] = s
+            self.trajectory_actions[t] = a
+            self.trajectory_rewards[t] = reward
+            self.trajectory_next_states[t] = next_s
+            t += 1
+
+            if next_s >= 0:
+                path.append(next_s)
 
             # Move to the next state
-            state = next_state
+            last_s, s = s, next_s
+
+        # Update Q-values using q-learning update rule, from the last step
+        self.backward_update(t)
+
+        # Render the whole episode with the updated Q-values if requested
+        if render and not self.headless:
+            policy = self.extract_policy()
+            self.render(
+                current_state=self.states[last_s],
+                action=actions[a],
+                path=[self.states[i] for i in path],
+                policy=policy,
+            )
 
         return total_reward
 
@@ -192,7 +344,11 @@ class RLAgent:
         """Run Q-learning algoritm to learn a policy"""
         
         best_reward = float("-inf")
-        episode_rewards = []
+        # Rewards of the last 100 episodes (a ring buffer) and their sum
+        recent_rewards = np.zeros(100)
+        recent_sum = 0.0
+        # Number of the last episodes with the same reward
+        same_reward_streak = 0
 
         # Run multiple episodes to learn 
         for episode  in range(MAX_EPISODES):
@@ -204,25 +360,78 @@ class RLAgent:
 
             # Run a single episode of Q-learning
             reward = self.run_episode(render=render)
-            episode_rewards.append(reward)
+            i = episode % len(recent_rewards)
+            recent_sum += reward - recent_rewards[i]
+            previous_reward = recent_rewards[i - 1]
+            recent_rewards[i] = reward
+            if reward == previous_reward:
+                same_reward_streak += 1
+            else:
+                same_reward_streak = 1
 
             if reward > best_reward:
                 best_reward = reward
 
             if episode % 100 == 0:
-                avg_reward = sum(episode_rewards[-100:]) / min(100, len(episode_rewards))
+                avg_reward = recent_sum / min(100, episode + 1)
                 print(f"Episode {episode}/{MAX_EPISODES}, Epsilon: {self.current_epsilon:.3f}, "
                 f"Avg Reward: {avg_reward:.2f}, Best Reward: {best_reward:.2f}")
             
-            if len(episode_rewards) >= 100:
-                recent_rewards = episode_rewards[-100:]
-                if all(r == recent_rewards[0] for r in recent_rewards) and episode > 200:
-                    print(f"Converged after {episode} episodes!")
-                    break
-                
-            # Extract and return the learned policy
-            final_policy = self.extract_policy()
-            print(f"Training completed. Final policy found after {episode+1} episodes.")
+            if episode > 200 and same_reward_streak >= len(recent_rewards):
+                print(f"Converged after {episode} episodes!")
+                break
+
+        # Extract and return the learned policy
+        final_policy = self.extract_policy()
+        print(f"Training completed. Final policy found after {episode+1} episodes.")
+
+        return final_policy
+
+    def learn_policy_parallel(
+        self, n_workers: int = 4, episodes_per_sync: int = 50
+    ) -> Policy:
+        """
+        Run Q-learning algoritm in parallel processes to learn a policy
+
+        The MAX_EPISODES episodes are split among n_workers agents. After every
+        episodes_per_sync episodes of each worker, the Q-tables of the workers
+        are averaged and all workers continue from the average. Epsilon decays
+        with the total number of episodes, as in learn_policy.
+        N_workers: The number of worker processes
+        Episodes_per_sync: The number of episodes of a worker between averaging
+        Returns: The learned policy
+        """
+        epsilon_decay = self.epsilon_decay**n_workers
+        episode = 0
+        # Spawn fresh workers; forking a process with running threads (e.g. Tk
+        # or Numba thread pools) may deadlock
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(
+            n_workers, initializer=_init_training_worker, initargs=(self,)
+        ) as pool:
+            while episode < MAX_EPISODES:
+                n_episodes = min(
+                    episodes_per_sync, ceil((MAX_EPISODES - episode) / n_workers)
+                )
+                seeds = self.rng.integers(2**63, size=n_workers).tolist()
+                epsilon = self.current_epsilon
+                args = [
+                    (self.q_table, epsilon, epsilon_decay, n_episodes, seed)
+                    for seed in seeds
+                ]
+                results = pool.starmap(_train_episodes, args)
+                self.q_table[:] = np.mean([q_table for q_table, _ in results], axis=0)
+                self.current_epsilon = max(
+                    self.epsilon_min, self.current_epsilon * epsilon_decay**n_episodes
+                )
+                episode += n_workers * n_episodes
+                avg_reward = np.mean([rewards for _, rewards in results])
+                print(f"Episode {episode}/{MAX_EPISODES}, Epsilon: {self.current_epsilon:.3f}, "
+                f"Avg Reward: {avg_reward:.2f}")
+
+        # Extract and return the learned policy
+        final_policy = self.extract_policy()
+        print(f"Training completed. Final policy found after {episode} episodes.")
 
         return final_policy
 
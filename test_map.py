@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+from kuimaze2 import Action, Map, State
+from kuimaze2.map import Border, Role
+
+ALL_BORDERS = Border.TOP | Border.RIGHT | Border.BOTTOM | Border.LEFT
+
+
+def test_creation():
+    map = Map.from_string("S.\n#G")
+    assert map.width == 2
+    assert map.height == 2
+    assert len(map) == 4
+
+
+def test_undefined_cells_are_walls():
+    map = Map.from_string("S..\nG")
+    assert map[State(1, 1)].role == Role.WALL
+    assert map[State(1, 2)].role == Role.WALL
+    assert map[State(5, 5)].role == Role.WALL
+
+
+class TestBorders:
+    def test_single_cell(self):
+        map = Map.from_string("G")
+        assert map[State(0, 0)].border == ALL_BORDERS
+
+    def test_walls_have_all_borders(self):
+        map = Map.from_string("S#G")
+        assert map[State(0, 1)].border == ALL_BORDERS
+
+    def test_free_cells(self):
+        map = Map.from_string(
+            """
+            S..
+            .#G
+            """
+        )
+        assert map[State(0, 0)].border == Border.TOP | Border.LEFT
+        assert map[State(0, 1)].border == Border.TOP | Border.BOTTOM
+        assert map[State(1, 0)].border == Border.LEFT | Border.BOTTOM | Border.RIGHT
+        assert map[State(1, 2)].border == Border.LEFT | Border.BOTTOM | Border.RIGHT
+
+
+def test_from_roles():
+    map = Map.from_roles(np.array([[ord("S"), ord(".")], [ord("#"), ord("G")]]))
+    assert str(map) == str(Map.from_string("S.\n#G"))
+    assert map.start == State(0, 0)
+    assert map.goals == {State(1, 1)}
+
+
+def test_from_string_unknown_role():
+    with pytest.raises(ValueError):
+        Map.from_string("S.X")
+
+
+def test_multiple_starts():
+    map = Map.from_string("S.S")
+    with pytest.raises(ValueError):
+        map.start
+
+
+def test_transition_possible():
+    map = Map.from_string("S.\n#G")
+    assert map.transition_possible(State(0, 0), Action.RIGHT)
+    assert not map.transition_possible(State(0, 0), Action.DOWN)
+    assert not map.transition_possible(State(0, 0), Action.UP)
+    assert map.transition_possible(State(5, 5), Action.UP)
+
+
+
+@pytest.mark.parametrize(
+    "mode, wall, free",
+    [
+        ("RGB", (0, 0, 0), (255, 255, 255)),
+        ("RGBA", (0, 0, 0, 255), (255, 255, 255, 255)),
+        ("L", 0, 255),
+    ],
+)
+def test_map_from_image_color_keys(tmp_path, mode, wall, free):
+    Image = pytest.importorskip("PIL.Image")
+    from kuimaze2.map_image import map_from_image
+
+    image = Image.new(mode, (2, 1), free)
+    image.putpixel((1, 0), wall)
+    image.save(tmp_path / "map.png")
+    map = map_from_image(tmp_path / "map.png", {wall: Role.WALL, free: Role.EMPTY})
+    assert map[State(0, 0)].role == Role.EMPTY
+    assert map[State(0, 1)].role == Role.WALL
+
+
+def test_map_from_image_invalid_color_key(tmp_path):
+    Image = pytest.importorskip("PIL.Image")
+    from kuimaze2.map_image import map_from_image
+
+    Image.new("RGB", (1, 1)).save(tmp_path / "map.png")
+    with pytest.raises(ValueError):
+        map_from_image(tmp_path / "map.png", {(0, 0): Role.WALL})
@@ -0,0 +1,160 @@
+import pickle
+
+import numpy as np
+import pytest
+from kuimaze2 import Action, Map, MDPProblem, State
+from kuimaze2 import kernels
+from kuimaze2.mdp import Rewards, StochasticActions
+
+MAP = """
+...G
+.#.D
+S...
+"""
+
+STOCHASTIC = dict(forward=0.8, left=0.1, right=0.1, backward=0.0)
+
+
+def test_deterministic_transition():
+    env = MDPProblem(Map.from_string(MAP))
+    assert env.get_next_states_and_probs(State(2, 0), Action.UP) == [(State(1, 0), 1.0)]
+    assert env.get_next_states_and_probs(State(2, 0), Action.LEFT) == [(State(2, 0), 1.0)]
+
+
+def test_transition_from_terminal():
+    env = MDPProblem(Map.from_string(MAP))
+    assert env.get_next_states_and_probs(State(0, 3), Action.UP) == [(None, 1.0)]
+
+
+def test_stochastic_transition():
+    env = MDPProblem(Map.from_string(MAP), action_probs=STOCHASTIC)
+    next_states_and_probs = env.get_next_states_and_probs(State(2, 0), Action.UP)
+    assert dict(next_states_and_probs) == pytest.approx(
+        {State(1, 0): 0.8, State(2, 1): 0.1, State(2, 0): 0.1}
+    )
+
+
+@pytest.mark.parametrize("action_probs", [None, STOCHASTIC])
+def test_transition_arrays(action_probs):
+    env = MDPProblem(Map.from_string(MAP), action_probs=action_probs)
+    for s, state in enumerate(env.get_states()):
+        for action in env.get_actions(state):
+            expected = env.get_next_states_and_probs(state, action)
+            next_states = env._next_states[s, action]
+            probs = env._probs[s, action]
+            assert len(expected) == len(next_states) == len(probs)
+            for (next_state, prob), idx, p in zip(expected, next_states, probs):
+                assert (env._states[idx] if idx >= 0 else None) == next_state
+                assert p == prob
+
+
+class TestStochasticActions:
+    def test_sample_action_forward_only(self):
+        model = StochasticActions(forward=1.0, left=0.0, right=0.0, backward=0.0)
+        assert all(model.sample_action(Action.UP) == Action.UP for _ in range(100))
+
+    def test_sample_action_right_only(self):
+        model = StochasticActions(forward=0.0, left=0.0, right=1.0, backward=0.0)
+        assert all(model.sample_action(Action.UP) == Action.RIGHT for _ in range(100))
+
+    def test_sample_actions(self):
+        model = StochasticActions(forward=0.0, left=0.0, right=0.0, backward=1.0)
+        actions = np.array([Action.UP, Action.RIGHT, Action.DOWN, Action.LEFT])
+        assert model.sample_actions(actions).tolist() == [2, 3, 0, 1]
+
+
+def test_terminal_flags():
+    env = MDPProblem(Map.from_string(MAP))
+    expected = [env.is_terminal(state) for state in env.get_states()]
+    assert env._is_terminal_arr.tolist() == expected
+    assert sum(expected) == 2
+
+
+def test_step_batch():
+    env = MDPProblem(Map.from_string(MAP))
+    states = env.get_states()
+    idx = [states.index(State(2, 0)), states.index(State(0, 3))]
+    next_states, rewards, finished = env.step_batch(idx, [Action.UP, Action.UP])
+    assert next_states[0] == states.index(State(1, 0))
+    assert next_states[1] == -1
+    assert rewards.tolist() == [env.get_reward(State(2, 0)), env.get_reward(State(0, 3))]
+    assert finished.tolist() == [False, True]
+    with pytest.raises(ValueError):
+        env.step_batch(next_states, [Action.UP, Action.UP])
+
+
+def test_step_batch_stochastic():
+    action_probs = dict(forward=0.0, left=0.0, right=1.0, backward=0.0)
+    env = MDPProblem(Map.from_string(MAP), action_probs=action_probs)
+    states = env.get_states()
+    next_states, _, _ = env.step_batch([states.index(State(2, 0))], [Action.UP])
+    assert next_states.tolist() == [states.index(State(2, 1))]
+
+
+@pytest.mark.parametrize("action_probs", [None, STOCHASTIC])
+def test_bellman_max(action_probs):
+    env = MDPProblem(Map.from_string(MAP), action_probs=action_probs)
+    values = np.linspace(-1, 1, len(env._states))
+    expected = [
+        max(
+            env.get_reward(state)
+            + 0.9
+            * sum(
+                prob * values[env._state_to_idx[next_state]]
+                for next_state, prob in env.get_next_states_and_probs(state, action)
+                if next_state is not None
+            )
+            for action in env.get_actions(state)
+        )
+        for state in env._states
+    ]
+    args = (values, env._state_rewards, env._next_states, env._probs, 0.9)
+    assert kernels.bellman_max(*args) == pytest.approx(expected)
+    assert kernels._bellman_max_numpy(*args) == pytest.approx(expected)
+
+
+def test_rollout_batch():
+    rewards = Rewards(goal=1, danger=-1, normal=-0.5)
+    env = MDPProblem(Map.from_string("S.G"), rewards=rewards)
+    policy = {state: Action.RIGHT for state in env.get_states()}
+    rewards = env.rollout_batch(policy, n_rollouts=4, max_steps=10, processes=2)
+    assert rewards == [[-0.5, -0.5, 1.0]] * 4
+    rewards = env.rollout_batch(policy, n_rollouts=2, max_steps=1, processes=2)
+    assert rewards == [[-0.5]] * 2
+
+
+def test_rollout_batch_stochastic():
+    rewards = Rewards(goal=1, danger=-1, normal=-0.5)
+    # RIGHT is always confused to UP or DOWN, i.e., into the walls
+    action_probs = dict(forward=0.0, left=0.5, right=0.5, backward=0.0)
+    env = MDPProblem(Map.from_string("S.G"), action_probs=action_probs, rewards=rewards)
+    policy = {state: Action.RIGHT for state in env.get_states()}
+    rewards = env.rollout_batch(policy, n_rollouts=4, max_steps=5, processes=2)
+    assert rewards == [[-0.5] * 5] * 4
+
+
+@pytest.mark.parametrize("action_probs", [None, STOCHASTIC])
+def test_bellman_max_numba(action_probs):
+    pytest.importorskip("numba")
+    env = MDPProblem(Map.from_string(MAP), action_probs=action_probs)
+    values = np.linspace(-1, 1, len(env._states))
+    args = (values, env._state_rewards, env._next_states, env._probs, 0.9)
+    expected = kernels._bellman_max_numpy(*args)
+    assert kernels._bellman_max_numba(*args) == pytest.approx(expected)
+
+
+def test_actions_probs_are_read_only():
+    model = StochasticActions(**STOCHASTIC)
+    with pytest.raises(TypeError):
+        model.get_actions_probs(Action.UP)[Action.UP] = 0.0
+
+
+def test_pickle_stochastic():
+    env = MDPProblem(Map.from_string(MAP), action_probs=STOCHASTIC)
+    copy = pickle.loads(pickle.dumps(env))
+    state = env.get_states()[0]
+    assert copy.get_next_states_and_probs(
+        state, Action.UP
+    ) == env.get_next_states_and_probs(state, Action.UP)
+    with pytest.raises(TypeError):
+        copy._actions_model.get_actions_probs(Action.UP)[Action.UP] = 0.0
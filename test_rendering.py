@@ -0,0 +1,54 @@
+import tkinter as tk
+
+import numpy as np
+import pytest
+from kuimaze2.map import Role
+from kuimaze2.rendering import COLOR_FROM_ROLE, Color, ColorFromValue, _tcl_word
+
+WHITE = Color(255, 255, 255)
+
+
+class TestColorFromValue:
+    def test_ends_and_middle(self):
+        color_from_value = ColorFromValue((-1, 1))
+        assert color_from_value(-1) == COLOR_FROM_ROLE[Role.DANGER]
+        assert color_from_value(0) == WHITE
+        assert color_from_value(1) == COLOR_FROM_ROLE[Role.GOAL]
+
+    def test_asymmetric_range(self):
+        color_from_value = ColorFromValue((-10, 1))
+        assert color_from_value(0) == WHITE
+        assert color_from_value(-5) == COLOR_FROM_ROLE[Role.DANGER].mix(WHITE, 0.5)
+
+    def test_clamping(self):
+        color_from_value = ColorFromValue((-1, 1))
+        assert color_from_value(-5) == COLOR_FROM_ROLE[Role.DANGER]
+        assert color_from_value(5) == COLOR_FROM_ROLE[Role.GOAL]
+
+    @pytest.mark.parametrize(
+        "value_range", [(-1, 1), (-10, 1), (2, 5), (-5, -2), (1, 1)]
+    )
+    def test_call_matches_colors(self, value_range):
+        color_from_value = ColorFromValue(value_range)
+        values = np.linspace(-12, 12, 2401).tolist()
+        assert [color_from_value(v) for v in values] == color_from_value.colors(values)
+
+    def test_map_values(self):
+        color_from_value = ColorFromValue((-1, 1))
+        rgb = color_from_value.map_values(np.array([-1.0, 0.0, 1.0]))
+        assert rgb.shape == (3, 3)
+        assert [Color(*c) for c in rgb.tolist()] == color_from_value.colors([-1, 0, 1])
+
+
+@pytest.mark.parametrize(
+    "value", ["", "0.5", "-1.25", "a b", "{", "}{", "[x] $y;", 'q"\\', "1\n2"]
+)
+def test_tcl_word(value):
+    interp = tk.Tcl()
+    assert interp.eval(f"set word {_tcl_word(value)}") == value
+
+
+def test_tcl_word_list():
+    interp = tk.Tcl()
+    word = _tcl_word(("Helvetica", 12))
+    assert interp.splitlist(interp.eval(f"set word {word}")) == ("Helvetica", "12")
@@ -0,0 +1,69 @@
+import pytest
+from kuimaze2 import Action, Map, RLProblem, State
+from kuimaze2.mdp import Rewards
+
+from rl_agent import RLAgent
+
+
+@pytest.fixture
+def agent():
+    rewards = Rewards(goal=1, danger=-1, normal=-0.1)
+    env = RLProblem(Map.from_string("S.G"), rewards=rewards)
+    return RLAgent(env, gamma=0.9, alpha=0.5, seed=0)
+
+
+def test_update_q_value(agent):
+    agent.update_q_value(State(0, 2), Action.UP, 1.0, None)
+    assert agent.get_q_values()[State(0, 2)][Action.UP] == pytest.approx(0.5)
+    agent.update_q_value(State(0, 1), Action.RIGHT, -0.1, State(0, 2))
+    assert agent.get_q_values()[State(0, 1)][Action.RIGHT] == pytest.approx(
+        0.5 * (-0.1 + 0.9 * 0.5)
+    )
+    assert agent.get_values()[State(0, 1)] == pytest.approx(0.175)
+
+
+def test_learned_policy(agent):
+    for _ in range(200):
+        agent.run_episode()
+    policy = agent.extract_policy()
+    assert policy[State(0, 0)] == Action.RIGHT
+    assert policy[State(0, 1)] == Action.RIGHT
+
+
+def test_backward_update():
+    rewards = Rewards(goal=1, danger=-1, normal=-0.1)
+    env = RLProblem(Map.from_string("G\nS"), rewards=rewards)
+    agent = RLAgent(env, gamma=0.9, alpha=0.5)
+    agent.current_epsilon = 0.0
+    # Greedy: UP to the goal, then leave it
+    assert agent.run_episode() == pytest.approx(0.9)
+    assert agent.get_values()[State(0, 0)] == pytest.approx(0.5)
+    # The goal reward propagated back to the start in the same episode
+    assert agent.get_values()[State(1, 0)] == pytest.approx(0.175)
+
+
+def test_learn_policy(agent, capsys):
+    policy = agent.learn_policy()
+    assert policy[State(0, 0)] == Action.RIGHT
+    assert policy[State(0, 1)] == Action.RIGHT
+    assert capsys.readouterr().out.count("Training completed") == 1
+
+
+@pytest.mark.parametrize(
+    "action_probs", [None, dict(forward=0.8, left=0.1, right=0.1, backward=0.0)]
+)
+def test_learn_policy_parallel(action_probs, capsys):
+    rewards = Rewards(goal=1, danger=-1, normal=-0.1)
+    env = RLProblem(Map.from_string("S.G"), action_probs=action_probs, rewards=rewards)
+    agent = RLAgent(env, gamma=0.9, alpha=0.5, seed=0)
+    policy = agent.learn_policy_parallel(n_workers=2, episodes_per_sync=100)
+    assert policy[State(0, 0)] == Action.RIGHT
+    assert policy[State(0, 1)] == Action.RIGHT
+    assert "after 1000 episodes" in capsys.readouterr().out
+
+
+def test_learn_policy_converges(agent, capsys, monkeypatch):
+    rewards = iter([0.0] * 150 + [1.0] * 1000)
+    monkeypatch.setattr(agent, "run_episode", lambda render: next(rewards))
+    agent.learn_policy()
+    assert "Converged after 249 episodes!" in capsys.readouterr().out
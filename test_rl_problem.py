@@ -1,4 +1,5 @@
 from collections import Counter
+import pickle
 
 import pytest
 from kuimaze2 import Action, Map, RLProblem, State
@@ -51,6 +52,15 @@ class TestSampleAction:
         )
         assert action in env.get_action_space()
 
+    def test_sample_action_inexact_sum(self):
+        map = Map.from_string("SG")
+        env = RLProblem(map)
+        env.reset()
+        # Cumulative probabilities sum up to 0.9999999999999999
+        action_probs = {Action.UP: 0.7, Action.RIGHT: 0.1, Action.DOWN: 0.1}
+        action_probs[Action.LEFT] = 0.1
+        assert env.sample_action(action_probs) in env.get_action_space()
+
     def test_sample_action_UP(self):
         map = Map.from_string("SG")
         env = RLProblem(map)
@@ -119,3 +129,31 @@ class TestStep:
         assert new_state == None
         assert reward == 10  # Include also reward for reaching the goal state
         assert terminated == True
+
+
+def test_render_without_graphics():
+    env = RLProblem(Map.from_string("SG"))
+    assert env.headless
+    env.reset()
+    assert env.render(square_texts={State(0, 0): "x"}, wait=True) is None
+
+
+def test_step_batch():
+    map = Map.from_string("S.G")
+    env = RLProblem(map, rewards=Rewards(goal=10, danger=-10, normal=-5))
+    states = env.get_states()
+    idx = [states.index(State(0, 0)), states.index(State(0, 2))]
+    next_states, rewards, terminated = env.step_batch(idx, [Action.RIGHT, Action.UP])
+    assert next_states.tolist() == [states.index(State(0, 1)), -1]
+    assert rewards.tolist() == [-5, 10]
+    assert terminated.tolist() == [False, True]
+
+
+def test_pickle():
+    env = RLProblem(Map.from_string("S.G"))
+    env.reset()
+    copy = pickle.loads(pickle.dumps(env))
+    assert copy.get_states() == env.get_states()
+    copy.render()
+    copy.reset(State(0, 1))
+    assert copy.step(Action.RIGHT)[0] == State(0, 2)
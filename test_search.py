@@ -0,0 +1,54 @@
+from unittest.mock import Mock
+
+from kuimaze2 import Action, SearchProblem, State, keyboard
+from kuimaze2.search import TkSearchView
+
+
+def test_get_goals_returns_copy():
+    env = SearchProblem.from_string("S.G")
+    goals = env.get_goals()
+    assert goals == {State(0, 2)}
+    goals.clear()
+    assert env.get_goals() == {State(0, 2)}
+    assert env.is_goal(State(0, 2))
+
+
+def test_get_actions():
+    env = SearchProblem.from_string("S#G")
+    assert env.get_actions(State(0, 0)) == [
+        Action.UP,
+        Action.RIGHT,
+        Action.DOWN,
+        Action.LEFT,
+    ]
+    assert env.get_actions(State(0, 1)) == []
+
+
+def test_transition_costs():
+    env = SearchProblem.from_string("SD.G")
+    assert env.get_transition_result(State(0, 0), Action.RIGHT) == (State(0, 1), 1)
+    assert env.get_transition_result(State(0, 1), Action.RIGHT) == (State(0, 2), 10)
+    assert env.get_transition_result(State(0, 3), Action.RIGHT) == (State(0, 3), 0)
+
+
+def test_render_and_flush_without_graphics():
+    env = SearchProblem.from_string("S.G")
+    env.render(current_state=State(0, 0), wait=True)
+    env.flush()
+
+
+def test_tk_view_flushes_waits_and_paths(monkeypatch):
+    # No display here; only the redraw throttling is tested
+    view = object.__new__(TkSearchView)
+    view.env = SearchProblem.from_string("S.G")
+    view.tk, view.canvas, view._pending_renders = Mock(), Mock(), 0
+    monkeypatch.setattr(keyboard, "SKIP", True)
+    view.render()
+    assert view.tk.update.call_count == 0
+    view.render(wait=True)
+    assert view.tk.update.call_count == 1
+    view.render(path=[State(0, 0)])
+    assert view.tk.update.call_count == 2
+    for _ in range(TkSearchView.FLUSH_EVERY):
+        view.render()
+    assert view.tk.update.call_count == 3